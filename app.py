@@ -1,32 +1,295 @@
 import os
-from flask import Flask, redirect, url_for, session, request, render_template
+import logging
+from datetime import datetime, timedelta, timezone
+from flask import Flask, redirect, url_for, session, request, render_template, jsonify
 from requests_oauthlib import OAuth1Session, OAuth1
 import requests
 import google.generativeai as genai
+from tweet_store import TweetStore
+from summary_cache import SummaryCache, MemoryBackend, DiskBackend, make_key
+from summarizer import IncrementalSummarizer
+from jobs import JobQueue
+import twitter_client
+from scheduler import DigestScheduler
+from session_store import make_session_interface
+from metrics import Metrics, log_sampled, SIZE_BUCKETS
+from prompt_builder import estimate_tokens
+
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'))
 
 app = Flask(__name__)
 
-app.secret_key = "FLASK_KEY"
+app.secret_key = os.environ.get('FLASK_SECRET_KEY', "FLASK_KEY")
+
+# --- Session storage: 'cookie' (default), or server-side 'memory', 'sqlite' or 'redis' ---
+# Server-side backends keep tokens off the client and, with sqlite on a shared path or redis,
+# let any worker/instance pick up a session (including mid OAuth flow).
+# With 'cookie', the OAuth access tokens travel in the cookie itself: it is only signed (not
+# encrypted) and anyone who knows the key can forge it. Set FLASK_SECRET_KEY, and use a
+# server-side backend if tokens must never reach the browser.
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cookie')
+if SESSION_BACKEND == 'cookie' and not os.environ.get('FLASK_SECRET_KEY'):
+    app.logger.warning(
+        "!!! FLASK_SECRET_KEY is not set: cookie sessions are signed with the publicly known default key, "
+        "so anyone can forge sessions and read the OAuth tokens stored in them. Set FLASK_SECRET_KEY "
+        "and/or SESSION_BACKEND=sqlite|redis before deploying. !!!"
+    )
+SESSION_TTL = int(os.environ.get('SESSION_TTL', 7 * 24 * 3600))
+session_interface = make_session_interface(
+    SESSION_BACKEND,
+    SESSION_TTL,
+    db_path=os.environ.get('SESSION_DB_PATH', '/tmp/sessions.db'),
+    redis_url=os.environ.get('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+)
+if session_interface is not None:
+    app.session_interface = session_interface
 
 CONSUMER_KEY = os.environ.get('CONSUMER_KEY')
 CONSUMER_SECRET = os.environ.get('CONSUMER_SECRET')
 CALLBACK_URL = os.environ.get('CALLBACK_URL')
 
+# --- Instrumentation: per-stage timings on /metrics, large payloads only in sampled debug logs ---
+DEBUG_LOG_SAMPLE_RATE = float(os.environ.get('DEBUG_LOG_SAMPLE_RATE', 0.01))
+metrics = Metrics()
+metrics.describe('summary_stage_seconds', 'Time spent in each stage of the /summary pipeline.')
+metrics.describe('gemini_prompt_chars', 'Characters sent to Gemini per call.')
+metrics.describe('gemini_prompt_tokens', 'Prompt tokens per Gemini call (reported, else estimated).')
+metrics.describe('gemini_tokens_total', 'Tokens reported by Gemini usage metadata.')
+metrics.describe('summary_requests_total', 'Rendered /summary pages by how the summary was served.')
+metrics.describe('summary_cache_hits_total', 'Summary cache lookups that returned a stored summary.')
+metrics.describe('summary_cache_misses_total', 'Summary cache lookups that had to call Gemini.')
+
+# --- Local tweet store (only /tmp is writable on Vercel) ---
+TWEET_STORE_PATH = os.environ.get('TWEET_STORE_PATH', '/tmp/tweet_store.db')
+TWEET_STORE_LIMIT = int(os.environ.get('TWEET_STORE_LIMIT', 50))
+# How far back a sync pages through the timeline: a tweet count and optional time window
+TIMELINE_MAX_TWEETS = int(os.environ.get('TIMELINE_MAX_TWEETS', 50))
+TIMELINE_HOURS = float(os.environ.get('TIMELINE_HOURS', 0)) or None
+tweet_store = TweetStore(TWEET_STORE_PATH, max_tweets=max(TWEET_STORE_LIMIT, TIMELINE_MAX_TWEETS))
+
 # --- Gemini API Configuration ---
+GEMINI_MODEL_NAME = 'gemini-2.5-pro-preview-03-25'
 try:
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-2.5-pro-preview-03-25') 
-    print("Gemini API configured successfully.")
+    gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    app.logger.info("Gemini API configured successfully.")
     GEMINI_ENABLED = True
 except KeyError:
-    print("WARNING: GEMINI_API_KEY environment variable not set. Summarization will be disabled.")
+    app.logger.warning("GEMINI_API_KEY environment variable not set. Summarization will be disabled.")
     GEMINI_ENABLED = False
 except Exception as e:
-    print(f"WARNING: Error configuring Gemini API: {e}. Summarization will be disabled.")
+    app.logger.warning(f"Error configuring Gemini API: {e}. Summarization will be disabled.")
     GEMINI_ENABLED = False
 
 
+PROMPT_TEMPLATE = """
+        Analyze the following collection of tweets from a User's Home Feed.
+        Provide a concise summary highlighting the main themes, topics, significant news, or prevalent moods.
+        Focus on the most important information. Structure the summary clearly, perhaps using bullet points if appropriate.
+        Avoid simply listing tweets. Synthesize the information. Do not Include Any Other thing Just Directlu give Concise 
+        Summaries in points if there's some Link give that as well. Act as you are a Personalized Summariser for the Tweeter.
+
+        Tweets:
+        -------
+        {tweets}
+        -------
+
+        Summary:
+        """
+
+CHUNK_PROMPT_TEMPLATE = """
+        The following tweets are one slice of a User's Home Feed, in chronological order.
+        Write short factual notes covering the main topics, news and moods in this slice.
+        Keep any links that matter. These notes will be merged with notes from other slices later.
+
+        Tweets:
+        -------
+        {tweets}
+        -------
+
+        Notes:
+        """
+
+REDUCE_PROMPT_TEMPLATE = """
+        Below are notes taken from consecutive slices of a User's Home Feed, oldest first.
+        Provide a concise summary highlighting the main themes, topics, significant news, or prevalent moods.
+        Synthesize across the notes, merge repeated stories and keep the most important links.
+        Do not Include Any Other thing Just Directly give Concise Summaries in points.
+        Act as you are a Personalized Summariser for the Tweeter.
+
+        Notes:
+        -------
+        {tweets}
+        -------
+
+        Summary:
+        """
+
+# --- Summary cache (SUMMARY_CACHE_PATH switches to the shared on-disk backend) ---
+SUMMARY_CACHE_PATH = os.environ.get('SUMMARY_CACHE_PATH')
+SUMMARY_CACHE_TTL = int(os.environ.get('SUMMARY_CACHE_TTL', 3600))
+SUMMARY_CACHE_SIZE = int(os.environ.get('SUMMARY_CACHE_SIZE', 256))
+# Finished job results live in their own store, so they neither evict chunk summaries nor count
+# as cache lookups; any worker sharing SUMMARY_CACHE_PATH can answer polls from it
+if SUMMARY_CACHE_PATH:
+    summary_cache = SummaryCache(DiskBackend(SUMMARY_CACHE_PATH, max_entries=SUMMARY_CACHE_SIZE), ttl=SUMMARY_CACHE_TTL)
+    job_results = DiskBackend(SUMMARY_CACHE_PATH, max_entries=SUMMARY_CACHE_SIZE, table='job_results')
+else:
+    summary_cache = SummaryCache(MemoryBackend(max_entries=SUMMARY_CACHE_SIZE), ttl=SUMMARY_CACHE_TTL)
+    job_results = MemoryBackend(max_entries=SUMMARY_CACHE_SIZE)
+metrics.register_collector(lambda: [
+    ('summary_cache_hits_total', 'counter', summary_cache.stats()['hits']),
+    ('summary_cache_misses_total', 'counter', summary_cache.stats()['misses']),
+])
+
+# --- Incremental (map-reduce) summarization over stable tweet-ID chunks ---
+# Chunks hold about half this many tweets and never more. Every window is chunked, even one
+# that would fit in a single prompt: the default 50-tweet window costs about 3 chunk calls plus a
+# reduce when cold, but a refresh with a few new tweets only re-summarizes the newest chunk and
+# the reduce. Raise it for fewer, larger cold calls; lower it for cheaper refreshes.
+SUMMARY_CHUNK_SIZE = int(os.environ.get('SUMMARY_CHUNK_SIZE', 50))
+# Duplicates are collapsed, then chunks are cut so no prompt's tweets exceed this many (estimated)
+# tokens; only the reduce over chunk notes is trimmed if it runs over
+PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', 8000))
+DEDUPE_THRESHOLD = float(os.environ.get('DEDUPE_THRESHOLD', 0.6))
+
+
+def generate_summary(prompt):
+    """Send a single prompt to Gemini and return the text."""
+    log_sampled(app.logger, DEBUG_LOG_SAMPLE_RATE, "Gemini prompt: %s", prompt)
+    with metrics.timer('gemini_call'):
+        response = gemini_model.generate_content(prompt)
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', None) or estimate_tokens(prompt)
+    metrics.observe('gemini_prompt_chars', len(prompt), buckets=SIZE_BUCKETS)
+    metrics.observe('gemini_prompt_tokens', prompt_tokens, buckets=SIZE_BUCKETS)
+    if usage is not None:
+        metrics.inc('gemini_tokens_total', getattr(usage, 'prompt_token_count', 0) or 0, kind='prompt')
+        metrics.inc('gemini_tokens_total', getattr(usage, 'candidates_token_count', 0) or 0, kind='output')
+    app.logger.info(f"Gemini summary received ({len(prompt)} prompt chars, ~{prompt_tokens} tokens)")
+    return response.text
+
+
+summarizer = IncrementalSummarizer(
+    generate_summary,
+    summary_cache,
+    GEMINI_MODEL_NAME,
+    PROMPT_TEMPLATE,
+    CHUNK_PROMPT_TEMPLATE,
+    REDUCE_PROMPT_TEMPLATE,
+    max_chunk_tweets=SUMMARY_CHUNK_SIZE,
+    token_budget=PROMPT_TOKEN_BUDGET,
+    dedupe_threshold=DEDUPE_THRESHOLD,
+    metrics=metrics
+)
+
+# --- Background summary jobs (the page renders tweets first and polls for the summary) ---
+SUMMARY_WORKERS = int(os.environ.get('SUMMARY_WORKERS', 4))
+# Cached summaries usually finish within this window and are rendered inline
+SUMMARY_INLINE_WAIT = float(os.environ.get('SUMMARY_INLINE_WAIT', 0.25))
+# Serverless instances are frozen once the response is sent, so a deferred job would never
+# finish there: wait for the summary inline instead (on by default on Vercel)
+SUMMARY_BLOCKING = os.environ.get('SUMMARY_BLOCKING', '1' if os.environ.get('VERCEL') else '0') == '1'
+summary_jobs = JobQueue(max_workers=SUMMARY_WORKERS)
+
+
+def timeline_window_start():
+    """Start of the configured TIMELINE_HOURS window, or None for no time limit."""
+    if not TIMELINE_HOURS:
+        return None
+    return datetime.now(timezone.utc) - timedelta(hours=TIMELINE_HOURS)
+
+
+def sync_timeline(user_id, auth):
+    """Page new tweets since the stored watermark into the tweet store; return how many arrived."""
+    start_time = timeline_window_start()
+
+    # Hold the user's lock across reading the watermark and paging, so parallel refreshes don't double-fetch
+    with twitter_client.user_lock(user_id):
+        since_id = tweet_store.newest_id(user_id)
+        newest_id = None
+        oldest_id = None
+        fetched = 0
+        batch = []
+        for tweet in twitter_client.iter_timeline(user_id, auth, max_tweets=TIMELINE_MAX_TWEETS,
+                                                  since_id=since_id, start_time=start_time):
+            newest_id = newest_id or tweet['id']
+            oldest_id = tweet['id']
+            log_sampled(app.logger, DEBUG_LOG_SAMPLE_RATE, "Timeline tweet for user %s: %s", user_id, tweet)
+            batch.append(tweet)
+            if len(batch) >= twitter_client.MAX_PAGE_SIZE:
+                tweet_store.merge(user_id, batch, advance_watermark=False)
+                fetched += len(batch)
+                batch = []
+        fetched += len(batch)
+        if since_id is not None and fetched >= TIMELINE_MAX_TWEETS:
+            # Hit the limit before reaching since_id: tweets may be missing between this sync and
+            # the stored ones, so restart the window from what was just fetched
+            tweet_store.discard_older(user_id, oldest_id)
+        # The watermark only moves once every page has been stored
+        tweet_store.merge(user_id, batch, newest_id)
+    return fetched
+
+
+NO_TWEETS_MESSAGE = "No tweets found in the timeline to summarize."
+
+
+def summary_job_id(tweets):
+    return make_key(tweets, PROMPT_TEMPLATE, GEMINI_MODEL_NAME)
+
+
+def submit_summary_job(tweets):
+    """Queue summarization of a tweet window; identical windows share one job."""
+    job_id = summary_job_id(tweets)
+
+    def run():
+        summary_text = summarizer.summarize(tweets)
+        if summary_text is None:
+            # Nothing left after dropping links, media-only tweets and duplicates; not worth caching
+            return NO_TWEETS_MESSAGE
+        job_results.set(job_id, summary_text, ttl=SUMMARY_CACHE_TTL)
+        return summary_text
+
+    return summary_jobs.submit(job_id, run)
+
+
+# --- Scheduled digests: pre-build summaries for users who opted in ---
+DIGEST_DB_PATH = os.environ.get('DIGEST_DB_PATH', '/tmp/digests.db')
+DIGEST_INTERVAL = int(os.environ.get('DIGEST_INTERVAL', 900))
+# Users are claimed in DIGEST_DB_PATH, so workers sharing it never duplicate a refresh; this cap
+# applies per scheduling process, so enable the scheduler in one worker for a strict global cap
+DIGEST_MAX_CONCURRENCY = int(os.environ.get('DIGEST_MAX_CONCURRENCY', 2))
+DIGEST_RATE_LIMIT_RESERVE = int(os.environ.get('DIGEST_RATE_LIMIT_RESERVE', 5))
+
+
+def precompute_digest(user_id, access_token, access_token_secret):
+    """Sync a user's timeline and warm the summary cache; skip if this window is already summarized."""
+    auth = OAuth1(CONSUMER_KEY, CONSUMER_SECRET, access_token, access_token_secret)
+    sync_timeline(user_id, auth)
+    tweets = tweet_store.get_window(user_id, since=timeline_window_start())
+    if not GEMINI_ENABLED or not tweets:
+        return False
+    # Checking the stored result (not the sync count) means a run that failed after syncing is retried
+    if job_results.get(summary_job_id(tweets)) is not None:
+        return False
+    # Same job key as /summary, so a visit during the run waits on this job instead of starting another
+    job_status = summary_jobs.wait(submit_summary_job(tweets), None)
+    return job_status['status'] == 'done'
+
+
+digest_scheduler = DigestScheduler(
+    precompute_digest,
+    DIGEST_DB_PATH,
+    interval=DIGEST_INTERVAL,
+    max_concurrency=DIGEST_MAX_CONCURRENCY,
+    rate_limit_reserve=DIGEST_RATE_LIMIT_RESERVE
+)
+# Needs a long-running process (e.g. gunicorn); serverless instances are frozen between requests
+if os.environ.get('DIGEST_SCHEDULER_ENABLED') == '1':
+    digest_scheduler.start()
+
+
 @app.route('/')
 def home():
     """Initiate OAuth 1.0a by fetching a request token and redirecting to Twitter."""
@@ -57,6 +320,17 @@ def callback():
         session['access_token'] = access_token_response['oauth_token']
         session['access_token_secret'] = access_token_response['oauth_token_secret']
         session.pop('request_token', None)
+        # New session ID on login so a pre-login cookie can't ride along into the signed-in session
+        if hasattr(session, 'regenerate'):
+            session.regenerate()
+
+        # The user ID never changes, so resolve it once here instead of on every /summary
+        try:
+            auth = OAuth1(CONSUMER_KEY, CONSUMER_SECRET, session['access_token'], session['access_token_secret'])
+            with metrics.timer('user_lookup'):
+                session['user_id'] = twitter_client.fetch_user_id(auth)
+        except Exception as e:
+            app.logger.warning(f"Could not resolve user ID during callback, will retry on /summary: {e}")
         return redirect(url_for('summary'))
     except Exception as e:
         error_message = f'Error getting access token. Please ensure your Callback URL is set correctly in Twitter Developer Portal ({CALLBACK_URL}). Error: {str(e)}'
@@ -77,92 +351,104 @@ def summary():
         session['access_token_secret']
     )
 
-    # Step 1: Get the authenticated user's ID (using v2 endpoint)
-    user_url = "https://api.twitter.com/2/users/me"
-    user_id = None
-    try:
-        user_response = requests.get(user_url, auth=auth)
-        user_response.raise_for_status()
-        user_data = user_response.json()
-        user_id = user_data['data']['id']
-    except requests.exceptions.RequestException as e:
-        app.logger.error(f"Error fetching user ID: {e}")
-        return f"Error fetching user ID: {str(e)} - Response: {e.response.text if e.response else 'No Response'}"
-    except KeyError as e:
-        return f"Error parsing user data: Missing key {e}. Response: {user_response.text}"
-    except Exception as e:
-        return f"An unexpected error occurred while fetching user data: {str(e)}"
-
-    timeline_url = f"https://api.twitter.com/2/users/{user_id}/timelines/reverse_chronological"
+    # Step 1: Get the authenticated user's ID (resolved once in callback(), cached in the session)
+    user_id = session.get('user_id')
+    if user_id is None:
+        try:
+            with metrics.timer('user_lookup'):
+                user_id = twitter_client.fetch_user_id(auth)
+            session['user_id'] = user_id
+        except requests.exceptions.RequestException as e:
+            app.logger.error(f"Error fetching user ID: {e}")
+            return f"Error fetching user ID: {str(e)} - Response: {e.response.text if e.response is not None else 'No Response'}"
+        except KeyError as e:
+            return f"Error parsing user data: Missing key {e}."
+        except Exception as e:
+            return f"An unexpected error occurred while fetching user data: {str(e)}"
 
-    query_params = {
-        'max_results': 50,
-    }
-
-    tweets = []
+    # Step 2: Pull any new tweets into the local store
     timeline_error = None
     try:
-        timeline_response = requests.get(timeline_url, auth=auth, params=query_params)
-        timeline_response.raise_for_status()
-        timeline_data = timeline_response.json()
-        #timeline_data = {'data': [{'id': '1917334675485249932', 'edit_history_tweet_ids': ['1917334675485249932'], 'text': '‘It takes 10 months to lay hands on officers’: Supreme Court slams MP Police over custodial death https://t.co/5aPW6KTuE4'}, {'id': '1917333071210176686', 'edit_history_tweet_ids': ['1917333071210176686'], 'text': 'Mann says no to Saini request for water: ‘You used 103% of quota’ https://t.co/zQxb0BKfyS'}, {'id': '1917332794017034534', 'edit_history_tweet_ids': ['1917332794017034534'], 'text': 'Digha Jagannath temple to open today, CM Mamata Banerjee says: ‘All our guests’ https://t.co/mVEEFrPR4U'}, {'id': '1917332785578070520', 'edit_history_tweet_ids': ['1917332785578070520'], 'text': 'Horoscope Today 30 April, 2025: Aries, Cancer, Virgo and other sun signs – check astrological predictions https://t.co/IXsJLb5QQn'}, {'id': '1917332777961243011', 'edit_history_tweet_ids': ['1917332777961243011'], 'text': 'President Droupadi Murmu appoints Justice B R Gavai as next Chief Justice; will take oath on May 14 https://t.co/eziGaBhQTg'}, {'id': '1917330552933474703', 'edit_history_tweet_ids': ['1917330552933474703'], 'text': 'Let the man have his cashews. Marvel Studios’ #Thunderbolts* arrives only in theaters Friday. Get tickets now: https://t.co/bFq0RNfp6K https://t.co/7CBLrkXOEE'}, {'id': '1917330036387881275', 'edit_history_tweet_ids': ['1917330036387881275'], 'text': '#WATCH | Rajasthan | Gaurav Tanwar, a Fire Officer, says, "As soon as we received the fire information, we reached the spot. We started the operation to douse the fire. We are hopeful that by morning we will be able to control the situation..." https://t.co/CCATaJsZvT https://t.co/sFY2Ei6RaT'}, {'id': '1917327645710377245', 'edit_history_tweet_ids': ['1917327645710377245'], 'text': '#WATCH | Ahmedabad, Gujarat | Sharad Singhal, Joint CP (Crime) says, "Chandola lake is a government property. In the last 3-5 years, Gujarat ATS had arrested terrorists from here...A vast drug cartel has been busted here...In the past 3 years, a lot of drug cases have been lodged https://t.co/tVvgKnxwzE'}, {'id': '1917327623421563126', 'edit_history_tweet_ids': ['1917327623421563126'], 'text': 'Full focus. https://t.co/K6UatThWCm'}, {'id': '1917327578718671297', 'edit_history_tweet_ids': ['1917327578718671297'], 'text': 'BJP slams Congress over X poster of ‘missing’ PM https://t.co/Eej4GmQhDF'}, {'id': '1917326847420850288', 'edit_history_tweet_ids': ['1917326847420850288'], 'text': 'PM Modi: Govt modernising education system for 21st century needs https://t.co/wJTSitItcZ'}, {'id': '1917326838461784560', 'edit_history_tweet_ids': ['1917326838461784560'], 'text': 'Delhi Confidential: Route Change https://t.co/MGE7DhuVMQ'}, {'id': '1917326827527233797', 'edit_history_tweet_ids': ['1917326827527233797'], 'text': 'Amid BJP fire, Congress tells leaders to toe party’s line on Pahalgam https://t.co/ed2MuH5c01'}, {'id': '1917322624717185237', 'edit_history_tweet_ids': ['1917322624717185237'], 'text': '#WATCH | Rajasthan | A massive fire broke out at a factory in the Palra Industrial area of Ajmer. Fire tenders are present at the spot. Operations are underway to douse the fire. More details awaited. https://t.co/3tIEGEq6TV'}, {'id': '1917322103336100036', 'edit_history_tweet_ids': ['1917322103336100036'], 'text': '#WATCH | Rajasthan | A massive fire broke out at a factory in the Palra Industrial area of Ajmer. Fire tenders are present at the spot. Operations are underway to douse the fire. More details awaited. https://t.co/TW1KV7HOTa'}, {'id': '1917318512953156062', 'edit_history_tweet_ids': ['1917318512953156062'], 'text': 'Don’t miss Florence Pugh’s performance in Marvel Studios’ #Thunderbolts* ⚡️\n\nOnly in theaters Friday. Get tickets now: https://t.co/wDb2uh7B3v https://t.co/UiGjODYnGL'}, {'id': '1917316292790411391', 'edit_history_tweet_ids': ['1917316292790411391'], 'text': '#HBDNeerajakona @NeerajaKona \n\n#TelusuKada Will be a crazy outing for us can’t wait for the TrackOoOoOoOo to be on playlists 🙌🏿 https://t.co/X7rQ9jWfnf'}, {'id': '1917311727936356802', 'edit_history_tweet_ids': ['1917311727936356802'], 'text': 'Court rejects discharge applications by seven accused, including Oreva group MD, in Morbi bridge tragedy https://t.co/69YWArXqVi'}, {'id': '1917309866810527947', 'edit_history_tweet_ids': ['1917309866810527947'], 'text': 'RT @rightarmleftist: Just IN:— 🚨 The woman, Minal Ahmed Khan, married the CRPF jawan in May 2024 via video chat and later visited India on…'}, {'id': '1917309520201531415', 'edit_history_tweet_ids': ['1917309520201531415'], 'text': 'How a wedding video helped Gujarat’s Navsari police track down murder accused who jumped parole 27 years ago https://t.co/geLxIsBaX4'}, {'id': '1917308607877582953', 'edit_history_tweet_ids': ['1917308607877582953'], 'text': 'Beggars’ Home in Surat, 300-year-old haveli in Ahmedabad: Where Gujarat Police has housed people picked up in drive against illegal immigrants https://t.co/AT5kU6sUW1'}, {'id': '1917308596951404618', 'edit_history_tweet_ids': ['1917308596951404618'], 'text': 'Maharashtra govt scraps Re 1 crop insurance; switches back to old system https://t.co/4P1Vcb6gNq'}, {'id': '1917308589397471679', 'edit_history_tweet_ids': ['1917308589397471679'], 'text': 'Aligarh: 15-yr-old boy assaulted, ‘forced to urinate’ on Pakistan flag, say police https://t.co/GWc90xKvoa'}, {'id': '1917306590413078745', 'edit_history_tweet_ids': ['1917306590413078745'], 'text': 'Didi depression pe gyan de rhi thi— \n\nkya lagta hai abhi khud ye depression me hogi?? 😂 https://t.co/fjqsiA9Ec1'}, {'id': '1917306084605452671', 'edit_history_tweet_ids': ['1917306084605452671'], 'text': "Kamindu Mendis 🤝 Dushmantha Chameera\n\nWe just can't pick which catch was better! 🤔\n\nWhat's your take, folks❓\n\n#TATAIPL | #CSKvSRH | #DCvKKR | @SunRisers | @DelhiCapitals https://t.co/ARfLQPeZwc"}, {'id': '1917304113509060797', 'edit_history_tweet_ids': ['1917304113509060797'], 'text': 'RT @heyitsjennalynn: #Thunderbolts simultaneously broke &amp; healed something in me. Scrappy, with great action &amp; emotional nuance in a way th…'}, {'id': '1917303904364011902', 'edit_history_tweet_ids': ['1917303904364011902'], 'text': 'SP leaders’ Pahalgam attack remarks similar to Pak rhetoric: Yogi Adityanath https://t.co/FI2GsyyvOx'}, {'id': '1917303891265245585', 'edit_history_tweet_ids': ['1917303891265245585'], 'text': 'UP police receives ‘hoax’ threat message about bombs at Vapi textile units, 1 arrested https://t.co/JQU3if4GqJ'}, {'id': '1917303818532053047', 'edit_history_tweet_ids': ['1917303818532053047'], 'text': 'RT @SammyJReacts: #Thunderbolts is ABSOLUTE CINEMA. As emotionally resonant as it is entertaining. The thematic element of self-worth deliv…'}, {'id': '1917302472441200822', 'edit_history_tweet_ids': ['1917302472441200822'], 'text': '#WATCH | On being asked, the State Department\'s response to the Pakistan Minister\'s statement about performing dirty work for the United States while also denying the existence of Lashkar-e-Taiba in Pakistan, US State Department spokesperson Tammy Bruce says, "The Secretary of https://t.co/mng8pXVrkp'}, {'id': '1917302189451550826', 'edit_history_tweet_ids': ['1917302189451550826'], 'text': '20 days after coming to Kota, NEET aspirant hangs self; 13th suicide this year https://t.co/gCBScqsQd7'}, {'id': '1917300830987837586', 'edit_history_tweet_ids': ['1917300830987837586'], 'text': 'Nationalist Muslims in India were openly seen removing Pakistani flags from the road 🥰\n\nNow @zoo_bear will fact check and say: "They removed it because they thought it was an Islamic flag" 🤡\n\n https://t.co/DtRWtCMv9h'}, {'id': '1917300468893597762', 'edit_history_tweet_ids': ['1917300468893597762'], 'text': 'How KKR’s all-action hero Sunil Narine kept his team’s slim playoff hopes alive https://t.co/YPwD74CX0W'}, {'id': '1917300144527040662', 'edit_history_tweet_ids': ['1917300144527040662'], 'text': 'RT @IExpressSports: How #KKR’s all-action hero #SunilNarine kept his team’s slim playoff hopes alive | By @namitkumar_17 \n\nhttps://t.co/A6U…'}, {'id': '1917300036008042786', 'edit_history_tweet_ids': ['1917300036008042786'], 'text': '#WATCH | On the United States being in touch with the leadership of both Pakistan and India, US State Department spokesperson Tammy Bruce says, "That is correct. The secretary also gave me a note about that as well. So we are reaching out regarding the Kashmir situation, India https://t.co/E1FxQ2WZak'}, {'id': '1917299375988003073', 'edit_history_tweet_ids': ['1917299375988003073'], 'text': 'Children studying in govt schools in Maharashtra to get personalised health cards https://t.co/jZxmQ1aBm8'}, {'id': '1917299212909244707', 'edit_history_tweet_ids': ['1917299212909244707'], 'text': 'PAKISTAN MURDABAD! https://t.co/KkgaybXPIP'}, {'id': '1917298661484089786', 'edit_history_tweet_ids': ['1917298661484089786'], 'text': '‘Very hard thing to do’: Trump says not ‘looking’ at third term https://t.co/8pmd7WKNgu'}, {'id': '1917297334028795946', 'edit_history_tweet_ids': ['1917297334028795946'], 'text': 'Mumbai: Two booked for sexual assault and abuse in Wadala, police file swift chargesheets https://t.co/zBeTVgEnKE'}, {'id': '1917296627775332506', 'edit_history_tweet_ids': ['1917296627775332506'], 'text': 'A CRPF jawan’s Pakistani wife has been deported after visa violations.\n\nWhat the actual fuck? Such marriages can pose serious national security risks.\n\nKya chal rha h bhai ye sab is desh mein… https://t.co/S9EjoFMKid'}, {'id': '1917294869971607973', 'edit_history_tweet_ids': ['1917294869971607973'], 'text': 'Stoked for my boy competing in his first ever race finishing 3rd in his class, proud moment ❤️ https://t.co/E9AEK8IJFo'}, {'id': '1917294351438217679', 'edit_history_tweet_ids': ['1917294351438217679'], 'text': '1 killed as fire breaks out at Kolkata hotel https://t.co/inxaEav3Le'}, {'id': '1917294336972099868', 'edit_history_tweet_ids': ['1917294336972099868'], 'text': 'HC rejects plea seeking stay on demolition in Ahmedabad slum from where 890 were picked up in drive against illegal immigrants https://t.co/e5OSklLk9X'}, {'id': '1917294327635628056', 'edit_history_tweet_ids': ['1917294327635628056'], 'text': 'After Kalmadi gets clean chit: Congress leaders, aides raise decibel level to reinstate Suresh Kalmadi with dignity https://t.co/9EnD6sjrCA'}, {'id': '1917293310047121469', 'edit_history_tweet_ids': ['1917293310047121469'], 'text': 'Pakistan’s Foreign Minister, Ishaq Dar, says he had the name of the terror group TRF removed from the UNSC statement condemning the Pahalgam terror attack.\n\nIf it’s true, then by removing TRF’s name, Pakistan may be attempting to avoid international scrutiny or accusations that https://t.co/w6fFEAINtP'}, {'id': '1917292992295039170', 'edit_history_tweet_ids': ['1917292992295039170'], 'text': 'T 5264 -'}, {'id': '1917292133976805806', 'edit_history_tweet_ids': ['1917292133976805806'], 'text': 'एक औरत है केवल! आठ लाख कश्मीरी हिन्दुओं को भयावह नरसंहार के पश्चात् जब घाटी त्यागनी पड़ी, कब कोई कश्मीरी बाहर नहीं आया था। उसके बाद भी, हर वर्ष हत्याएँ होती रहीं, कोई बाहर नहीं आया था। https://t.co/IC4JudQUxB'}, {'id': '1917292104205885805', 'edit_history_tweet_ids': ['1917292104205885805'], 'text': 'ପୁରୀ ଲୋକସଭାର ନୟାଗଡ଼ ନିର୍ବାଚନ ମଣ୍ଡଳୀ ଅନ୍ତର୍ଗତ ଲାଠିପଡା ଗ୍ରାମ ପଂଚାୟତକୁ ଗସ୍ତ ସମୟରେ ସ୍ଥାନୀୟ ଜନସାଧାରଣଙ୍କର ଭବ୍ୟ ସ୍ୱାଗତ ତଥା ଭଲପାଇବା ପାଇଁ ସମସ୍ତଙ୍କୁ ମୋର ଅନ୍ତରରୁ ଧନ୍ୟବାଦ ଜଣାଉଛି ।\n\nଏହି ଅବସରରେ ଅନେକ ଦଶନ୍ଧି ଧରି ଚାଲି ଆସୁଥିବା ପବିତ୍ର ଅଷ୍ଟପ୍ରହରୀ କାର୍ଯ୍ୟକ୍ରମରେ ଶ୍ରଦ୍ଧାଳୁମାନଙ୍କ ସହ ସମ୍ମିଳିତ ହେବାର ସୁଯୋଗ https://t.co/kduR4aKBen'}, {'id': '1917291028060492126', 'edit_history_tweet_ids': ['1917291028060492126'], 'text': 'Maharashtra to establish trust to accelerate infra projects https://t.co/oKHwY8G71g'}, {'id': '1917288464472490186', 'edit_history_tweet_ids': ['1917288464472490186'], 'text': 'UP govt to denotify 11 historic buildings, repurpose them for heritage tourism https://t.co/5asmZGOrNB'}], 'meta': {'next_token': '7140dibdnow9c7btw4e02o4gme7gs6yztb5znbgbwa912', 'result_count': 50, 'newest_id': '1917334675485249932', 'oldest_id': '1917288464472490186'}}
-        print(timeline_data)
-        tweets = timeline_data.get('data', []) # v2 format
-        print(f"Fetched {len(tweets)} tweets using v2 endpoint.")
+        with metrics.timer('timeline_fetch'):
+            new_tweet_count = sync_timeline(user_id, auth)
+        app.logger.info(f"Fetched {new_tweet_count} new tweets using v2 endpoint.")
 
     except requests.exceptions.RequestException as e:
-        timeline_error = f"Error fetching timeline: {e.response.status_code if e.response else 'N/A'} - {e.response.text if e.response else str(e)}"
+        timeline_error = f"Error fetching timeline: {e.response.status_code if e.response is not None else 'N/A'} - {e.response.text if e.response is not None else str(e)}"
     except Exception as e:
         timeline_error = f"An unexpected error occurred fetching timeline: {str(e)}"
 
+    # Render from the stored window (falls back to stale data if the fetch failed)
+    tweets = tweet_store.get_window(user_id, since=timeline_window_start())
 
     # Step 3: Generate Summary with Gemini (if enabled and tweets exist)
     summary_text = "Summarization disabled or no tweets found."
+    summary_job_id = None
     if GEMINI_ENABLED and tweets:
-        # Prepare text for Gemini
-        # Concatenate the 'text' field of each tweet
-        full_text_for_summary = "\n\n---\n\n".join([tweet.get('text', '') for tweet in tweets if tweet.get('text')])
-
-        # Create the prompt
-        prompt = f"""
-        Analyze the following collection of tweets from a User's Home Feed.
-        Provide a concise summary highlighting the main themes, topics, significant news, or prevalent moods.
-        Focus on the most important information. Structure the summary clearly, perhaps using bullet points if appropriate.
-        Avoid simply listing tweets. Synthesize the information. Do not Include Any Other thing Just Directlu give Concise 
-        Summaries in points if there's some Link give that as well. Act as you are a Personalized Summariser for the Tweeter.
-
-        Tweets:
-        -------
-        {full_text_for_summary}
-        -------
-
-        Summary:
-        """
-
-        print("\n--- Sending text to Gemini for summarization ---")
-        print("--- End of text ---")
-
-        # Call Gemini API
-        response = gemini_model.generate_content(prompt)
-        summary_text = response.text
-        print("\n--- Gemini Summary Received ---")
-        print("--- End of Summary ---")
+        # Identical tweet windows share one job; only new or grown chunks hit Gemini
+        job_id = submit_summary_job(tweets)
+        job_status = summary_jobs.wait(job_id, None if SUMMARY_BLOCKING else SUMMARY_INLINE_WAIT)
+        metrics.inc('summary_requests_total', served='inline' if job_status['status'] == 'done' else 'deferred')
+        if job_status['status'] == 'done':
+            summary_text = job_status['result']
+        elif job_status['status'] == 'error':
+            summary_text = f"Could not generate summary: {job_status['error']}"
+        else:
+            summary_text = "Generating summary..."
+            summary_job_id = job_id
 
 
     elif not GEMINI_ENABLED:
          summary_text = "Summarization feature is currently disabled (API key not configured)."
     elif not tweets and not timeline_error:
-         summary_text = "No tweets found in the timeline to summarize."
+         summary_text = NO_TWEETS_MESSAGE
     elif timeline_error:
          summary_text = "Could not generate summary because the timeline could not be fetched."
 
 
     # Render the tweets and summary in the template
-    return render_template('summary.html',
-                           tweets=tweets,
-                           summary=summary_text,
-                           timeline_error=timeline_error,
-                           gemini_enabled=GEMINI_ENABLED)
+    with metrics.timer('template_render'):
+        return render_template('summary.html',
+                               tweets=tweets,
+                               summary=summary_text,
+                               timeline_error=timeline_error,
+                               gemini_enabled=GEMINI_ENABLED,
+                               summary_job_id=summary_job_id,
+                               digest_subscribed=digest_scheduler.is_subscribed(user_id))
+
+@app.route('/summary/status/<job_id>')
+def summary_status(job_id):
+    """Report the state of a background summary job for the page to poll."""
+    if 'access_token' not in session:
+        return jsonify({'status': 'unauthorized'}), 401
+    job_status = summary_jobs.status(job_id)
+    if job_status['status'] == 'unknown':
+        # The job may have run in another worker/instance that shares the job results store
+        summary_text = job_results.get(job_id)
+        if summary_text is None:
+            return jsonify(job_status), 404
+        job_status = {'status': 'done', 'result': summary_text}
+    return jsonify(job_status)
+
+@app.route('/digest/subscribe')
+def digest_subscribe():
+    """Opt the current user in to scheduled digests."""
+    if 'access_token' not in session or 'user_id' not in session:
+        return redirect(url_for('home'))
+    digest_scheduler.subscribe(session['user_id'], session['access_token'], session['access_token_secret'])
+    return redirect(url_for('summary'))
+
+@app.route('/digest/unsubscribe')
+def digest_unsubscribe():
+    """Stop building scheduled digests for the current user."""
+    if 'user_id' in session:
+        digest_scheduler.unsubscribe(session['user_id'])
+    return redirect(url_for('summary'))
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Expose pipeline timings, prompt sizes and cache stats in Prometheus text format."""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 @app.route('/logout')
 def logout():
@@ -0,0 +1,135 @@
+"""Load-test the /summary route offline against recorded Twitter fixtures and a fake Gemini model.
+
+Usage: python benchmarks/bench_summary.py [--requests 200] [--concurrency 8] [--gemini-latency 3.0] [--cold-sessions]
+
+Twitter is served by the local stub (benchmarks/stub_twitter.py) from
+fixtures/home_timeline.json; Gemini is replaced by a model that sleeps for
+--gemini-latency seconds. Reports throughput, p50/p95/p99 page latency and the
+per-stage means recorded by the app's /metrics instrumentation. With
+--cold-sessions the session has no cached user_id, so every page load also
+pays for the user lookup (as the first /summary after an old login would).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_twitter import start_stub_server  # noqa: E402
+
+STAGES = ('user_lookup', 'timeline_fetch', 'prompt_build', 'gemini_call', 'template_render')
+
+
+class FakeResponse:
+    def __init__(self, text, prompt_tokens, output_tokens):
+        self.text = text
+        self.usage_metadata = type('Usage', (), {
+            'prompt_token_count': prompt_tokens,
+            'candidates_token_count': output_tokens,
+        })()
+
+
+class FakeGeminiModel:
+    """Stand-in for genai.GenerativeModel with a fixed response latency."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return FakeResponse("- Benchmark summary point one\n- Benchmark summary point two", len(prompt) // 4, 20)
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='total /summary requests')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--users', type=int, default=4, help='distinct signed-in users to spread requests over')
+    parser.add_argument('--gemini-latency', type=float, default=3.0, help='seconds per fake Gemini call')
+    parser.add_argument('--twitter-latency', type=float, default=0.05, help='seconds per stub Twitter response')
+    parser.add_argument('--inline-wait', type=float, default=0.25,
+                        help='SUMMARY_INLINE_WAIT: how long a page waits for its summary before deferring')
+    parser.add_argument('--no-summary-cache', action='store_true', help='disable the summary cache (cold Gemini path)')
+    parser.add_argument('--cold-sessions', action='store_true',
+                        help='leave user_id out of the session so /summary resolves it (measures user_lookup)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-summary-')
+    os.environ.setdefault('CONSUMER_KEY', 'bench-key')
+    os.environ.setdefault('CONSUMER_SECRET', 'bench-secret')
+    os.environ['TWEET_STORE_PATH'] = os.path.join(workdir, 'tweets.db')
+    os.environ['DIGEST_DB_PATH'] = os.path.join(workdir, 'digests.db')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    server, base_url = start_stub_server(response_delay=args.twitter_latency)
+    import twitter_client
+    twitter_client.API_BASE = base_url
+
+    import app as summary_app
+    from summary_cache import MemoryBackend
+    fake_model = FakeGeminiModel(args.gemini_latency)
+    summary_app.gemini_model = fake_model
+    summary_app.GEMINI_ENABLED = True
+    summary_app.SUMMARY_INLINE_WAIT = args.inline_wait
+    if args.no_summary_cache:
+        summary_app.summary_cache.backend = MemoryBackend(max_entries=0)
+
+    def page_load(index):
+        client = summary_app.app.test_client()
+        with client.session_transaction() as session:
+            session['access_token'] = f'token-{index % args.users}'
+            session['access_token_secret'] = 'secret'
+            if not args.cold_sessions:
+                session['user_id'] = str(index % args.users + 1)
+        start = time.perf_counter()
+        response = client.get('/summary')
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"/summary returned {response.status_code}")
+        return elapsed, b'data-job-id' in response.data
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(page_load, range(args.requests)))
+        wall = time.perf_counter() - started
+    finally:
+        server.shutdown()
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results)
+    deferred = sum(1 for _, was_deferred in results if was_deferred)
+    print(f"requests        {args.requests} ({args.concurrency} concurrent, {args.users} users)")
+    print(f"throughput      {args.requests / wall:.1f} req/s")
+    print(f"latency         mean {statistics.mean(latencies):.1f} ms   p50 {percentile(latencies, 0.50):.1f} ms   "
+          f"p95 {percentile(latencies, 0.95):.1f} ms   p99 {percentile(latencies, 0.99):.1f} ms")
+    print(f"summaries       {args.requests - deferred} inline, {deferred} deferred to polling")
+    print(f"gemini calls    {fake_model.calls}")
+    cache_stats = summary_app.summary_cache.stats()
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    if lookups:
+        print(f"summary cache   {cache_stats['hits']}/{lookups} hits ({100 * cache_stats['hits'] / lookups:.0f}%)")
+    print("stage means:")
+    for stage in STAGES:
+        count, mean = summary_app.metrics.stage_summary(stage)
+        if count:
+            print(f"  {stage:<16} {mean * 1000:9.2f} ms  (n={count})")
+
+
+if __name__ == '__main__':
+    main()
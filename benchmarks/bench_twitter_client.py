@@ -0,0 +1,59 @@
+"""Compare the old per-request Twitter calls with the pooled client against a local stub.
+
+Usage: python benchmarks/bench_twitter_client.py [--requests 200] [--connect-delay 0.02]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import twitter_client  # noqa: E402
+from stub_twitter import start_stub_server  # noqa: E402
+
+
+def old_page_load(base_url):
+    # What /summary used to do: two module-level requests.get calls, new connection each
+    requests.get(f"{base_url}/2/users/me").raise_for_status()
+    requests.get(f"{base_url}/2/users/1/timelines/reverse_chronological", params={'max_results': 50}).json()
+
+
+def new_page_load(base_url):
+    # User ID comes from the session; one call over a pooled keep-alive connection
+    twitter_client.fetch_timeline('1', None, params={'max_results': 50})
+
+
+def run(label, fn, base_url, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn(base_url)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{label:<28} mean {statistics.mean(timings):7.2f} ms   "
+          f"p50 {timings[len(timings) // 2]:7.2f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='page loads per variant')
+    parser.add_argument('--connect-delay', type=float, default=0.02,
+                        help='seconds added per new connection to model TCP/TLS setup')
+    parser.add_argument('--response-delay', type=float, default=0.0, help='seconds added per response')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.connect_delay, args.response_delay)
+    twitter_client.API_BASE = base_url
+    try:
+        run('requests.get x2 (old)', old_page_load, base_url, args.requests)
+        run('pooled session x1 (new)', new_page_load, base_url, args.requests)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
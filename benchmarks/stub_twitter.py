@@ -0,0 +1,96 @@
+"""Local stand-in for the Twitter v2 endpoints used by the app, for benchmarks."""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'home_timeline.json')
+
+
+def load_timeline_fixture():
+    with open(FIXTURE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class StubTwitterHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+    response_delay = 0.0
+    timeline = None
+    # Shared 429 state, see start_stub_server()
+    rate_limit = None
+
+    def setup(self):
+        # Runs once per TCP connection: stands in for the TCP + TLS handshake cost
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        time.sleep(self.response_delay)
+        reset = str(int(time.time() + self.rate_limit['reset_in']))
+        with self.rate_limit['lock']:
+            limited = self.rate_limit['remaining_429s'] > 0
+            self.rate_limit['remaining_429s'] -= limited
+        if limited:
+            self.send_response(429)
+            self.send_header('x-rate-limit-remaining', '0')
+            self.send_header('x-rate-limit-reset', reset)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path.startswith('/2/users/me'):
+            body = {'data': {'id': '1', 'name': 'Stub User', 'username': 'stub'}}
+        elif '/timelines/reverse_chronological' in self.path:
+            body = self.timeline_page(parse_qs(urlparse(self.path).query))
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('x-rate-limit-remaining', '179')
+        self.send_header('x-rate-limit-reset', str(int(time.time() + 900)))
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def timeline_page(self, query):
+        """Serve the fixture honouring since_id, max_results and pagination_token like the real API."""
+        since_id = int(query.get('since_id', ['0'])[0])
+        max_results = int(query.get('max_results', ['100'])[0])
+        offset = int(query.get('pagination_token', ['0'])[0])
+        tweets = [tweet for tweet in self.timeline['data'] if int(tweet['id']) > since_id]
+        page = tweets[offset:offset + max_results]
+        meta = {'result_count': len(page)}
+        if page:
+            meta['newest_id'] = page[0]['id']
+            meta['oldest_id'] = page[-1]['id']
+        if offset + max_results < len(tweets):
+            meta['next_token'] = str(offset + max_results)
+        return {'data': page, 'meta': meta} if page else {'meta': meta}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(connect_delay=0.0, response_delay=0.0, timeline=None, rate_limited=0, rate_limit_reset_in=1):
+    """Start the stub on a free local port in a daemon thread; return (server, base_url).
+
+    The first rate_limited requests get a 429 whose x-rate-limit-reset is
+    rate_limit_reset_in seconds away, like Twitter's per-window limits.
+    """
+    handler = type('Handler', (StubTwitterHandler,), {
+        'connect_delay': connect_delay,
+        'response_delay': response_delay,
+        'timeline': timeline if timeline is not None else load_timeline_fixture(),
+        'rate_limit': {'remaining_429s': rate_limited, 'reset_in': rate_limit_reset_in, 'lock': threading.Lock()},
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
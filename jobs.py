@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class JobQueue:
+    """Bounded background worker pool that de-duplicates identical in-flight jobs.
+
+    Jobs are identified by a caller-supplied key (e.g. a hash of the tweets being
+    summarized), so submitting the same work twice returns the existing job.
+    """
+
+    def __init__(self, max_workers=4, max_jobs=512):
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summary-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, job_id, fn):
+        """Run fn() in the background under job_id unless that job is already pending or done."""
+        with self._lock:
+            future = self._jobs.get(job_id)
+            # Failed jobs are retried on the next submit instead of being cached
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._pool.submit(fn)
+                self._jobs[job_id] = future
+            self._jobs.move_to_end(job_id)
+            self._evict()
+        return job_id
+
+    def wait(self, job_id, timeout):
+        """Block for up to timeout seconds for a job to finish; return its status."""
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is not None:
+            wait([future], timeout=timeout)
+        return self.status(job_id)
+
+    def status(self, job_id):
+        """Return a JSON-serializable status dict for a job."""
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            return {'status': 'unknown'}
+        if not future.done():
+            return {'status': 'running' if future.running() else 'pending'}
+        error = future.exception()
+        if error is not None:
+            return {'status': 'error', 'error': str(error)}
+        return {'status': 'done', 'result': future.result()}
+
+    def _evict(self):
+        # Drop the oldest finished jobs; in-flight ones are kept so pollers still find them
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, future in self._jobs.items() if future.done()][:max(excess, 0)]:
+            del self._jobs[job_id]
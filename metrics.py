@@ -0,0 +1,101 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds: cache hits sit at the bottom, cold Gemini calls at the top
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Metrics:
+    """Minimal thread-safe counters and histograms rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        with self._lock:
+            series = self._histograms.setdefault(name, (buckets, {}))[1]
+            key = _label_key(labels)
+            counts, total, count = series.get(key, ([0] * len(buckets), 0.0, 0))
+            counts = [c + 1 if value <= bound else c for c, bound in zip(counts, buckets)]
+            series[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def timer(self, stage):
+        """Record how long the block takes under summary_stage_seconds{stage=...}."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('summary_stage_seconds', time.perf_counter() - start, stage=stage)
+
+    def register_collector(self, collect):
+        """Add a callable returning [(name, type, value)] sampled at scrape time (e.g. cache stats)."""
+        self._collectors.append(collect)
+
+    def stage_summary(self, stage):
+        """Return (count, mean seconds) for a stage, for benchmark reports."""
+        with self._lock:
+            series = self._histograms.get('summary_stage_seconds', ((), {}))[1]
+            _, total, count = series.get(_label_key({'stage': stage}), ([], 0.0, 0))
+        return count, (total / count if count else 0.0)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, (buckets, series) in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, (counts, total, count) in sorted(series.items()):
+                    for bound, bucket_count in zip(buckets, counts):
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {bucket_count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+        for collect in self._collectors:
+            for name, metric_type, value in collect():
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def log_sampled(logger, rate, message, *args):
+    """Emit a debug log for roughly `rate` of calls, so big payloads don't flood the logs."""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < rate:
+        logger.debug(message, *args)
@@ -0,0 +1,155 @@
+import html
+import math
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+TCO_LINK_RE = re.compile(r'https?://t\.co/\S*')
+RETWEET_RE = re.compile(r'^RT @(\w+):\s*', re.IGNORECASE)
+MENTION_RE = re.compile(r'@\w+')
+NON_WORD_RE = re.compile(r'\W+')
+
+# MinHash / LSH settings: 16 bands of 4 rows catches pairs above roughly 0.5 Jaccard
+NUM_HASHES = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+SHINGLE_SIZE = 5
+# Each "hash function" is the shingle's CRC32 XORed with a fixed random 32-bit mask
+HASH_MASKS = [zlib.crc32(f'minhash-{i}'.encode('utf-8')) for i in range(NUM_HASHES)]
+# Tweets never change, so signatures are kept between jobs and only new tweets get hashed
+SIGNATURE_CACHE_SIZE = 20000
+# Shorter retweet bodies are too generic to match against an original by prefix alone
+MIN_RETWEET_PREFIX = 30
+
+# Rough tokens-per-character ratio for Gemini on mostly English text
+CHARS_PER_TOKEN = 4
+
+
+def normalize_text(text):
+    """Decode HTML entities, drop the '…' of truncated tweets and collapse whitespace.
+
+    Only the first complete t.co link is kept, moved to the end, so the model can
+    still cite it; the rest (usually media and quote-tweet links) are dropped.
+    """
+    text = html.unescape(text)
+    links = [link for link in TCO_LINK_RE.findall(text) if not link.endswith('…')]
+    text = TCO_LINK_RE.sub('', text)
+    text = ' '.join(text.split()).rstrip('…').strip()
+    return f"{text} {links[0]}".strip() if links else text
+
+
+def compact_text(text):
+    """Reduce normalized text to lowercase word characters for duplicate matching.
+
+    Links, spaces, punctuation, mentions and the RT prefix are removed, so
+    '#SunilNarine' and 'Sunil Narine' compare equal.
+    """
+    text = TCO_LINK_RE.sub('', text)
+    text = RETWEET_RE.sub('', text)
+    text = MENTION_RE.sub('', text)
+    return NON_WORD_RE.sub('', text).replace('_', '').lower()
+
+
+_signature_cache = OrderedDict()
+_signature_cache_lock = threading.Lock()
+
+
+def minhash(text):
+    """MinHash signature over character shingles of compacted text (memoized by text)."""
+    with _signature_cache_lock:
+        signature = _signature_cache.get(text)
+        if signature is not None:
+            _signature_cache.move_to_end(text)
+            return signature
+    shingles = {zlib.crc32(text[i:i + SHINGLE_SIZE].encode('utf-8'))
+                for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+    signature = tuple(min(shingle ^ mask for shingle in shingles) for mask in HASH_MASKS)
+    with _signature_cache_lock:
+        _signature_cache[text] = signature
+        while len(_signature_cache) > SIGNATURE_CACHE_SIZE:
+            _signature_cache.popitem(last=False)
+    return signature
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_HASHES
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def engagement(tweet):
+    metrics = tweet.get('public_metrics') or {}
+    return (metrics.get('like_count', 0) + 2 * metrics.get('retweet_count', 0)
+            + metrics.get('reply_count', 0) + metrics.get('quote_count', 0))
+
+
+def dedupe_tweets(tweets, threshold=0.6):
+    """Return normalized copies of tweets with exact, near and RT/original duplicates collapsed.
+
+    Originals win over retweets, otherwise the oldest copy is kept, so a newly
+    fetched duplicate does not change which tweets earlier chunks contain.
+    Output keeps the input order.
+    """
+    candidates = []
+    for tweet in tweets:
+        text = normalize_text(tweet.get('text', ''))
+        compact = compact_text(text)
+        if compact:
+            candidates.append((tweet, text, compact, bool(RETWEET_RE.match(text))))
+    # Originals first, then oldest first
+    candidates.sort(key=lambda candidate: (candidate[3], int(candidate[0]['id'])))
+
+    kept = []
+    seen_exact = set()
+    bands = {}
+    for tweet, text, compact, is_retweet in candidates:
+        if compact in seen_exact:
+            continue
+        # Retweet bodies are truncated, so they usually match a prefix of the original
+        if (is_retweet and len(compact) >= MIN_RETWEET_PREFIX
+                and any(other.startswith(compact) for other in seen_exact)):
+            continue
+        signature = minhash(compact)
+        band_keys = [(band, tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+                     for band in range(BANDS)]
+        matches = {index for key in band_keys for index in bands.get(key, ())}
+        if any(similarity(signature, kept[index][1]) >= threshold for index in matches):
+            continue
+        seen_exact.add(compact)
+        for key in band_keys:
+            bands.setdefault(key, []).append(len(kept))
+        kept.append((dict(tweet, text=text), signature))
+
+    kept_ids = {tweet['id'] for tweet, _ in kept}
+    normalized = {tweet['id']: tweet for tweet, _ in kept}
+    return [normalized[tweet['id']] for tweet in tweets if tweet['id'] in kept_ids]
+
+
+def fit_to_budget(tweets, max_tokens, recency_weight=0.5):
+    """Keep the highest-ranked tweets that fit in max_tokens, ranked by recency and engagement.
+
+    The result keeps the input order so the prompt still reads chronologically.
+    """
+    if not max_tokens or sum(estimate_tokens(tweet.get('text', '')) for tweet in tweets) <= max_tokens:
+        return list(tweets)
+
+    newest_first = sorted(tweets, key=lambda tweet: int(tweet['id']), reverse=True)
+    recency = {tweet['id']: 1 - rank / len(newest_first) for rank, tweet in enumerate(newest_first)}
+    max_engagement = math.log1p(max(engagement(tweet) for tweet in tweets)) or 1
+
+    def score(tweet):
+        return (recency_weight * recency[tweet['id']]
+                + (1 - recency_weight) * math.log1p(engagement(tweet)) / max_engagement)
+
+    selected = set()
+    used = 0
+    for tweet in sorted(tweets, key=score, reverse=True):
+        cost = estimate_tokens(tweet.get('text', ''))
+        if used + cost <= max_tokens:
+            selected.add(tweet['id'])
+            used += cost
+    return [tweet for tweet in tweets if tweet['id'] in selected]
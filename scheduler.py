@@ -0,0 +1,146 @@
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import twitter_client
+
+logger = logging.getLogger(__name__)
+
+
+class DigestScheduler:
+    """Periodically pre-builds summaries for users who opted in to digests.
+
+    refresh(user_id, access_token, access_token_secret) does the actual work and
+    returns True if a new digest was built. The scheduler only decides
+    who is due: it caps how many users refresh at once and leaves users alone
+    while their home-timeline rate limit is nearly used up.
+    """
+
+    def __init__(self, refresh, path, interval=900, max_concurrency=2, rate_limit_reserve=5):
+        self.refresh = refresh
+        self.interval = interval
+        self.rate_limit_reserve = rate_limit_reserve
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='digest')
+        self._running = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS digest_subscriptions (
+                user_id TEXT PRIMARY KEY,
+                access_token TEXT NOT NULL,
+                access_token_secret TEXT NOT NULL,
+                last_run REAL
+            )
+        """)
+        self._conn.commit()
+
+    def subscribe(self, user_id, access_token, access_token_secret):
+        """Opt a user in, storing the OAuth tokens obtained in callback()."""
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO digest_subscriptions (user_id, access_token, access_token_secret) VALUES (?, ?, ?)
+                   ON CONFLICT(user_id) DO UPDATE SET access_token = excluded.access_token,
+                                                      access_token_secret = excluded.access_token_secret""",
+                (user_id, access_token, access_token_secret)
+            )
+            self._conn.commit()
+
+    def unsubscribe(self, user_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM digest_subscriptions WHERE user_id = ?", (user_id,))
+            self._conn.commit()
+
+    def is_subscribed(self, user_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM digest_subscriptions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row is not None
+
+    def due_users(self):
+        """Subscribed users whose last run is older than the interval and who have rate-limit headroom."""
+        cutoff = time.time() - self.interval
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT user_id, access_token, access_token_secret, last_run FROM digest_subscriptions
+                   WHERE last_run IS NULL OR last_run <= ? ORDER BY last_run""",
+                (cutoff,)
+            ).fetchall()
+            running = set(self._running)
+        due = []
+        for user_id, access_token, access_token_secret, last_run in rows:
+            if user_id in running:
+                continue
+            # Keep some of the user's window free for their own page loads
+            remaining = twitter_client.timeline_calls_remaining(user_id)
+            if remaining is not None and remaining <= self.rate_limit_reserve:
+                continue
+            due.append((user_id, access_token, access_token_secret))
+        return due
+
+    def claim(self, user_id):
+        """Atomically mark a due user as started; False if another worker/process got there first.
+
+        The claim lives in the shared SQLite file, so schedulers running in several
+        gunicorn workers never refresh the same user in the same interval.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE digest_subscriptions SET last_run = ?
+                   WHERE user_id = ? AND (last_run IS NULL OR last_run <= ?)""",
+                (now, user_id, now - self.interval)
+            )
+            self._conn.commit()
+            claimed = cursor.rowcount == 1
+            if claimed:
+                self._running.add(user_id)
+        return claimed
+
+    def run_once(self):
+        """Queue a refresh for every due user this process claims; returns the futures so callers can wait on them."""
+        futures = []
+        for user_id, access_token, access_token_secret in self.due_users():
+            if not self.claim(user_id):
+                continue
+            futures.append(self._pool.submit(self._run_user, user_id, access_token, access_token_secret))
+        return futures
+
+    def start(self, poll_interval=60):
+        """Run the scheduler loop in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, args=(poll_interval,), daemon=True, name='digest-scheduler')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, poll_interval):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception(f"Digest scheduler error: {e}")
+            self._stop.wait(poll_interval)
+
+    def _run_user(self, user_id, access_token, access_token_secret):
+        try:
+            built = self.refresh(user_id, access_token, access_token_secret)
+            logger.info(f"Digest for user {user_id}: {'rebuilt' if built else 'already up to date, skipped'}")
+            return built
+        except Exception as e:
+            logger.warning(f"Digest refresh failed for user {user_id}: {e}")
+            return False
+        finally:
+            with self._lock:
+                # Failed runs also wait a full interval, so a broken token doesn't burn rate limit
+                self._conn.execute(
+                    "UPDATE digest_subscriptions SET last_run = ? WHERE user_id = ?", (time.time(), user_id)
+                )
+                self._conn.commit()
+                self._running.discard(user_id)
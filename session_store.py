@@ -0,0 +1,185 @@
+import json
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose data lives in a backend; the cookie only carries an opaque ID."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.previous_sid = None
+
+    def regenerate(self):
+        """Move the data to a fresh ID (e.g. after login) so an old cookie can't be replayed."""
+        self.previous_sid = self.previous_sid or self.sid
+        self.sid = new_session_id()
+        self.modified = True
+
+
+def new_session_id():
+    return secrets.token_urlsafe(32)
+
+
+class MemorySessionBackend:
+    """Per-process dict store; fine for a single worker or local development."""
+
+    def __init__(self, sweep_every=256):
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.sweep_every = sweep_every
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at <= time.time():
+                del self._sessions[sid]
+                return None
+            return data
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._sessions[sid] = (data, time.time() + ttl)
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                now = time.time()
+                for expired in [key for key, (_, expires_at) in self._sessions.items() if expires_at <= now]:
+                    del self._sessions[expired]
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+class SqliteSessionBackend:
+    """SQLite store shared by every worker that can see the same file."""
+
+    def __init__(self, path, sweep_every=256):
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.sweep_every = sweep_every
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, sid):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)",
+                (sid, json.dumps(data), now + ttl)
+            )
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def delete(self, sid):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+            self._conn.commit()
+
+
+class RedisSessionBackend:
+    """Store for anything speaking the Redis protocol (Redis, Valkey, KeyDB, ...); expiry is native."""
+
+    def __init__(self, url, prefix='session:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package (pip install redis).")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, sid):
+        raw = self._client.get(self.prefix + sid)
+        return json.loads(raw) if raw else None
+
+    def set(self, sid, data, ttl):
+        self._client.set(self.prefix + sid, json.dumps(data), ex=int(ttl))
+
+    def delete(self, sid):
+        self._client.delete(self.prefix + sid)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps session data in a pluggable backend."""
+
+    def __init__(self, backend, ttl=7 * 24 * 3600):
+        self.backend = backend
+        self.ttl = ttl
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.backend.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=new_session_id(), new=True)
+
+    def save_session(self, app, session, response):
+        cookie_name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.previous_sid:
+            self.backend.delete(session.previous_sid)
+        if not session:
+            if session.modified:
+                self.backend.delete(session.sid)
+                response.delete_cookie(cookie_name, domain=domain, path=path)
+            return
+        if not self.should_set_cookie(app, session) and not session.new:
+            return
+        self.backend.set(session.sid, dict(session), self.ttl)
+        response.set_cookie(
+            cookie_name,
+            session.sid,
+            max_age=self.ttl,
+            httponly=self.get_cookie_httponly(app),
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+            domain=domain,
+            path=path
+        )
+
+
+def make_session_interface(backend_name, ttl, db_path=None, redis_url=None):
+    """Build the interface for SESSION_BACKEND; 'cookie' (or empty) keeps Flask's signed cookie sessions."""
+    if not backend_name or backend_name == 'cookie':
+        return None
+    if backend_name == 'memory':
+        backend = MemorySessionBackend()
+    elif backend_name == 'sqlite':
+        backend = SqliteSessionBackend(db_path)
+    elif backend_name == 'redis':
+        backend = RedisSessionBackend(redis_url)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND '{backend_name}' (expected cookie, memory, sqlite or redis)")
+    return ServerSideSessionInterface(backend, ttl=ttl)
@@ -0,0 +1,100 @@
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from prompt_builder import dedupe_tweets, estimate_tokens, fit_to_budget
+from summary_cache import make_key
+
+TWEET_SEPARATOR = "\n\n---\n\n"
+
+
+def join_tweets(tweets):
+    """Concatenate the 'text' field of each tweet for a prompt."""
+    return TWEET_SEPARATOR.join([tweet.get('text', '') for tweet in tweets if tweet.get('text')])
+
+
+class IncrementalSummarizer:
+    """Map-reduce summarizer that summarizes stable tweet-ID chunks once and reuses them.
+
+    The window is cut into chunks at boundaries chosen by the tweet IDs
+    themselves, so chunks keep the same contents (and cache key) as new tweets
+    arrive and old ones are evicted; only new or changed chunks go back to the
+    model before a short reduce over the chunk summaries. A window that forms a
+    single chunk is summarized with one prompt and no reduce.
+    """
+
+    def __init__(self, generate, cache, model_name, prompt_template, chunk_prompt_template,
+                 reduce_prompt_template, max_chunk_tweets=50, max_workers=4,
+                 token_budget=None, dedupe_threshold=0.6, metrics=None):
+        self.generate = generate
+        self.cache = cache
+        self.model_name = model_name
+        self.prompt_template = prompt_template
+        self.chunk_prompt_template = chunk_prompt_template
+        self.reduce_prompt_template = reduce_prompt_template
+        self.max_chunk_tweets = max_chunk_tweets
+        # A tweet ends a chunk with probability 1/boundary_every, giving chunks of about that size
+        self.boundary_every = max(max_chunk_tweets // 2, 1)
+        self.max_workers = max_workers
+        self.token_budget = token_budget
+        self.dedupe_threshold = dedupe_threshold
+        self.metrics = metrics
+
+    def chunk(self, tweets):
+        """Split tweets into chunks, oldest first.
+
+        A chunk ends after any tweet whose ID hashes to a boundary (content-defined
+        chunking), once it reaches max_chunk_tweets, or before the next tweet
+        would take it past token_budget. Boundaries depend only on the tweets
+        around them, so appending new tweets or evicting old ones only changes
+        the chunks at either end, whatever the size of the window.
+        """
+        ordered = sorted(tweets, key=lambda tweet: int(tweet['id']))
+        chunks = []
+        current = []
+        used = 0
+        for tweet in ordered:
+            cost = estimate_tokens(tweet.get('text', ''))
+            if current and self.token_budget and used + cost > self.token_budget:
+                chunks.append(current)
+                current = []
+                used = 0
+            current.append(tweet)
+            used += cost
+            is_boundary = zlib.crc32(str(tweet['id']).encode('utf-8')) % self.boundary_every == 0
+            if is_boundary or len(current) >= self.max_chunk_tweets:
+                chunks.append(current)
+                current = []
+                used = 0
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def summarize(self, tweets):
+        """Return a summary for the tweets, reusing cached chunk summaries where possible."""
+        with self._timer('prompt_build'):
+            tweets = dedupe_tweets(tweets, threshold=self.dedupe_threshold)
+            # Chunks are sized to the token budget, so every tweet reaches some prompt
+            chunks = self.chunk(tweets)
+        if not chunks:
+            return None
+        if len(chunks) == 1:
+            # Small timelines fit in one call, no reduce step needed
+            return self._cached_generate(chunks[0], self.prompt_template)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            chunk_summaries = list(pool.map(
+                lambda chunk: self._cached_generate(chunk, self.chunk_prompt_template), chunks
+            ))
+        # The reduce prompt has its own budget; later chunks get higher IDs, so the newest notes win
+        summary_tweets = [{'id': index, 'text': text} for index, text in enumerate(chunk_summaries)]
+        return self._cached_generate(fit_to_budget(summary_tweets, self.token_budget), self.reduce_prompt_template)
+
+    def _timer(self, stage):
+        return self.metrics.timer(stage) if self.metrics else nullcontext()
+
+    def _cached_generate(self, tweets, template):
+        key = make_key(tweets, template, self.model_name)
+        return self.cache.get_or_generate(
+            key, lambda: self.generate(template.format(tweets=join_tweets(tweets)))
+        )
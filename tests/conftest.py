@@ -0,0 +1,17 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The benchmarks' stub Twitter server also drives the twitter_client tests
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+
+@pytest.fixture
+def fixture_tweets():
+    """The recorded 50-tweet home timeline page used by the benchmarks."""
+    with open(os.path.join(ROOT, 'benchmarks', 'fixtures', 'home_timeline.json'), encoding='utf-8') as f:
+        return json.load(f)['data']
@@ -0,0 +1,59 @@
+import threading
+
+from jobs import JobQueue
+
+
+def test_identical_in_flight_jobs_run_once():
+    queue = JobQueue(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return 'summary'
+
+    assert queue.submit('k', work) == 'k'
+    queue.submit('k', work)
+    assert queue.status('k')['status'] in ('pending', 'running')
+    release.set()
+
+    assert queue.wait('k', 5) == {'status': 'done', 'result': 'summary'}
+    assert len(calls) == 1
+
+
+def test_failed_job_is_retried_on_next_submit():
+    queue = JobQueue(max_workers=1)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('gemini down')
+        return 'summary'
+
+    queue.submit('k', flaky)
+    assert queue.wait('k', 5) == {'status': 'error', 'error': 'gemini down'}
+    queue.submit('k', flaky)
+    assert queue.wait('k', 5) == {'status': 'done', 'result': 'summary'}
+
+
+def test_eviction_only_drops_finished_jobs():
+    queue = JobQueue(max_workers=2, max_jobs=1)
+    release = threading.Event()
+
+    queue.submit('done', lambda: 'old')
+    queue.wait('done', 5)
+    queue.submit('slow-1', lambda: release.wait(5))
+    queue.submit('slow-2', lambda: release.wait(5))
+
+    # Over the limit, but only the finished job can go
+    assert queue.status('done') == {'status': 'unknown'}
+    assert queue.status('slow-1')['status'] != 'unknown'
+    assert queue.status('slow-2')['status'] != 'unknown'
+    release.set()
+    assert queue.wait('slow-1', 5)['status'] == 'done'
+
+
+def test_unknown_job_status():
+    assert JobQueue().wait('missing', 0) == {'status': 'unknown'}
@@ -0,0 +1,59 @@
+import re
+
+from metrics import LATENCY_BUCKETS, Metrics
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[a-zA-Z_][a-zA-Z0-9_]*="[^"]*"(,[a-zA-Z_][a-zA-Z0-9_]*="[^"]*")*\})? (\S+)$')
+
+
+def parse(text):
+    """Check the Prometheus text format line by line; return {name: type} and the samples."""
+    assert text.endswith('\n')
+    types = {}
+    samples = []
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            assert name not in types
+            types[name] = metric_type
+            continue
+        match = SAMPLE_RE.match(line)
+        assert match, line
+        name, labels, value = match.group(1), match.group(2) or '', match.group(4)
+        float(value)
+        family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in types else name
+        assert family in types, f"{name} has no TYPE line before it"
+        samples.append((name, labels, float(value)))
+    return types, samples
+
+
+def test_render_produces_valid_prometheus_text():
+    metrics = Metrics()
+    metrics.describe('summary_stage_seconds', 'Time spent in each stage.')
+    metrics.inc('summary_requests_total', served='inline')
+    metrics.inc('summary_requests_total', served='deferred')
+    metrics.inc('summary_requests_total', served='inline')
+    for seconds in (0.003, 0.2, 45):
+        metrics.observe('summary_stage_seconds', seconds, stage='gemini_call')
+    metrics.register_collector(lambda: [('summary_cache_hits_total', 'counter', 7)])
+
+    types, samples = parse(metrics.render())
+    assert types == {'summary_requests_total': 'counter', 'summary_stage_seconds': 'histogram',
+                     'summary_cache_hits_total': 'counter'}
+    assert ('summary_requests_total', '{served="inline"}', 2) in samples
+    assert ('summary_cache_hits_total', '', 7) in samples
+
+    buckets = [value for name, _, value in samples if name == 'summary_stage_seconds_bucket']
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+    assert buckets == sorted(buckets)
+    assert buckets[0] == 1 and buckets[-2] == 2 and buckets[-1] == 3
+    assert ('summary_stage_seconds_count', '{stage="gemini_call"}', 3) in samples
+
+
+def test_timer_records_a_stage():
+    metrics = Metrics()
+    with metrics.timer('prompt_build'):
+        pass
+    count, mean = metrics.stage_summary('prompt_build')
+    assert count == 1 and mean >= 0
@@ -0,0 +1,79 @@
+from prompt_builder import dedupe_tweets, estimate_tokens, fit_to_budget, normalize_text
+
+AJMER_FIRE_IDS = ('1917322624717185237', '1917322103336100036')
+KKR_ORIGINAL_ID = '1917300468893597762'
+KKR_RETWEET_ID = '1917300144527040662'
+
+
+def kept_ids(tweets):
+    return {tweet['id'] for tweet in tweets}
+
+
+def test_normalize_text_decodes_entities_and_keeps_only_the_first_link():
+    text = 'RT @x: broke &amp; healed https://t.co/abc123 something https://t.co/media9 more…'
+    assert normalize_text(text) == 'RT @x: broke & healed something more https://t.co/abc123'
+
+
+def test_normalize_text_drops_truncated_links():
+    assert normalize_text('Budget session opens today https://t.co/ab…') == 'Budget session opens today'
+
+
+def test_tweets_differing_only_in_links_are_duplicates():
+    tweets = [
+        {'id': '1', 'text': 'Metro line 3 opens to the public this weekend https://t.co/aaa'},
+        {'id': '2', 'text': 'Metro line 3 opens to the public this weekend https://t.co/bbb'},
+    ]
+    assert kept_ids(dedupe_tweets(tweets)) == {'1'}
+
+
+def test_fixture_ajmer_fire_duplicates_collapse_to_oldest(fixture_tweets):
+    kept = kept_ids(dedupe_tweets(fixture_tweets))
+    newer, older = AJMER_FIRE_IDS
+    assert older in kept
+    assert newer not in kept
+
+
+def test_fixture_kkr_retweet_collapses_into_original(fixture_tweets):
+    kept = kept_ids(dedupe_tweets(fixture_tweets))
+    assert KKR_ORIGINAL_ID in kept
+    assert KKR_RETWEET_ID not in kept
+
+
+def test_fixture_drops_only_the_two_known_duplicates(fixture_tweets):
+    deduped = dedupe_tweets(fixture_tweets)
+    assert len(deduped) == len(fixture_tweets) - 2
+    # Output keeps the input (newest first) order
+    assert [tweet['id'] for tweet in deduped] == [tweet['id'] for tweet in fixture_tweets
+                                                  if tweet['id'] in kept_ids(deduped)]
+
+
+def test_short_retweet_is_not_dropped_by_an_unrelated_tweet_containing_it():
+    tweets = [
+        {'id': '1', 'text': 'Crowds celebrate in Mumbai as India wins the final by six wickets'},
+        {'id': '2', 'text': 'RT @a: India wins'},
+    ]
+    assert kept_ids(dedupe_tweets(tweets)) == {'1', '2'}
+
+
+def test_truncated_retweet_matching_the_start_of_an_original_is_dropped():
+    tweets = [
+        {'id': '1', 'text': 'Monsoon arrives in Kerala three days ahead of schedule, IMD says https://t.co/x'},
+        {'id': '2', 'text': 'RT @weather: Monsoon arrives in Kerala three days ahead of sched…'},
+    ]
+    assert kept_ids(dedupe_tweets(tweets)) == {'1'}
+
+
+def test_fit_to_budget_stays_within_budget_and_keeps_order(fixture_tweets):
+    fitted = fit_to_budget(fixture_tweets, 300)
+    assert sum(estimate_tokens(tweet['text']) for tweet in fitted) <= 300
+    assert 0 < len(fitted) < len(fixture_tweets)
+    positions = [fixture_tweets.index(tweet) for tweet in fitted]
+    assert positions == sorted(positions)
+
+
+def test_fit_to_budget_prefers_engagement_at_equal_recency():
+    tweets = [
+        {'id': '2', 'text': 'x' * 40, 'public_metrics': {'like_count': 0}},
+        {'id': '1', 'text': 'y' * 40, 'public_metrics': {'like_count': 5000}},
+    ]
+    assert kept_ids(fit_to_budget(tweets, 10, recency_weight=0.1)) == {'1'}
@@ -0,0 +1,29 @@
+from scheduler import DigestScheduler
+
+
+def test_two_schedulers_sharing_a_database_refresh_a_user_once(tmp_path):
+    path = str(tmp_path / 'digests.db')
+    calls = []
+
+    def refresh(user_id, access_token, access_token_secret):
+        calls.append(user_id)
+        return True
+
+    first = DigestScheduler(refresh, path, interval=900)
+    second = DigestScheduler(refresh, path, interval=900)
+    first.subscribe('u1', 'token', 'secret')
+
+    futures = first.run_once() + second.run_once()
+    assert [future.result() for future in futures] == [True]
+    assert calls == ['u1']
+
+
+def test_user_is_not_due_again_within_the_interval(tmp_path):
+    calls = []
+    scheduler = DigestScheduler(lambda *args: calls.append(args) or True, str(tmp_path / 'digests.db'), interval=900)
+    scheduler.subscribe('u1', 'token', 'secret')
+
+    for future in scheduler.run_once():
+        future.result()
+    assert scheduler.run_once() == []
+    assert len(calls) == 1
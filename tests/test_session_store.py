@@ -0,0 +1,91 @@
+import pytest
+from flask import Flask, jsonify, session
+
+import session_store
+from session_store import MemorySessionBackend, ServerSideSessionInterface, SqliteSessionBackend
+
+TTL = 3600
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionBackend()
+    return SqliteSessionBackend(str(tmp_path / 'sessions.db'))
+
+
+@pytest.fixture
+def client(backend):
+    app = Flask(__name__)
+    app.session_interface = ServerSideSessionInterface(backend, ttl=TTL)
+
+    @app.route('/start')
+    def start():
+        session['request_token'] = 'pre-login'
+        return 'ok'
+
+    @app.route('/login')
+    def login():
+        session['access_token'] = 'token'
+        session.regenerate()
+        return 'ok'
+
+    @app.route('/read')
+    def read():
+        return jsonify(dict(session))
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'ok'
+
+    return app.test_client()
+
+
+def session_id(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+def test_cookie_holds_only_an_opaque_id(client, backend):
+    client.get('/start')
+    sid = session_id(client)
+    assert 'pre-login' not in sid
+    assert backend.get(sid) == {'request_token': 'pre-login'}
+
+
+def test_unknown_session_id_is_not_adopted(client, backend):
+    client.set_cookie('session', 'attacker-chosen-id')
+    client.get('/start')
+
+    assert session_id(client) != 'attacker-chosen-id'
+    assert backend.get('attacker-chosen-id') is None
+
+
+def test_regenerate_moves_data_and_deletes_the_old_id(client, backend):
+    client.get('/start')
+    old_sid = session_id(client)
+    client.get('/login')
+    new_sid = session_id(client)
+
+    assert new_sid != old_sid
+    assert backend.get(old_sid) is None
+    assert backend.get(new_sid) == {'request_token': 'pre-login', 'access_token': 'token'}
+
+
+def test_logout_deletes_the_session_and_its_cookie(client, backend):
+    client.get('/login')
+    sid = session_id(client)
+    response = client.get('/logout')
+
+    assert backend.get(sid) is None
+    assert session_id(client) is None
+    assert 'session=;' in response.headers['Set-Cookie']
+
+
+def test_expired_session_starts_empty(client, monkeypatch):
+    client.get('/login')
+    now = session_store.time.time()
+    monkeypatch.setattr(session_store.time, 'time', lambda: now + TTL + 1)
+
+    assert client.get('/read').get_json() == {}
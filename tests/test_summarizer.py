@@ -0,0 +1,101 @@
+import random
+
+from summarizer import IncrementalSummarizer
+from summary_cache import MemoryBackend, SummaryCache
+
+
+def make_summarizer(calls, **kwargs):
+    def generate(prompt):
+        calls.append(prompt)
+        return f"summary {len(calls)}"
+    return IncrementalSummarizer(generate, SummaryCache(MemoryBackend()), 'test-model',
+                                 'FULL {tweets}', 'CHUNK {tweets}', 'REDUCE {tweets}', **kwargs)
+
+
+WORDS = ('court', 'election', 'cricket', 'monsoon', 'budget', 'metro', 'festival', 'startup',
+         'rupee', 'vaccine', 'border', 'cinema', 'railway', 'exam', 'harvest', 'summit')
+
+
+def synthetic_tweets(count, start=1_900_000_000_000_000_000):
+    # Random word salads, so none of them collapse as near-duplicates
+    rng = random.Random(42)
+    return [{'id': str(start + i * 1_000_003), 'text': ' '.join(rng.choice(WORDS) for _ in range(12))}
+            for i in range(count)]
+
+
+def test_single_chunk_window_uses_one_gemini_call():
+    calls = []
+    summarizer = make_summarizer(calls, max_chunk_tweets=1000)
+
+    assert summarizer.summarize(synthetic_tweets(5)) == 'summary 1'
+    assert len(calls) == 1
+    assert calls[0].startswith('FULL')
+
+
+def test_default_window_reuses_chunks_when_one_tweet_arrives(fixture_tweets):
+    calls = []
+    summarizer = make_summarizer(calls)
+
+    # The fixture is newest first: summarize it without, then with, its newest tweet
+    summarizer.summarize(fixture_tweets[1:])
+    assert len(calls) > 2
+    calls.clear()
+    summarizer.summarize(fixture_tweets)
+    # The newest chunk changed, plus the reduce
+    assert len(calls) == 2
+    assert calls[-1].startswith('REDUCE')
+
+
+def test_repeat_summary_is_served_from_cache(fixture_tweets):
+    calls = []
+    summarizer = make_summarizer(calls)
+
+    summarizer.summarize(fixture_tweets)
+    first_run = len(calls)
+    summarizer.summarize(list(reversed(fixture_tweets)))
+    assert len(calls) == first_run
+
+
+def test_chunks_cover_every_tweet_and_respect_max_size():
+    summarizer = make_summarizer([], max_chunk_tweets=20)
+    tweets = synthetic_tweets(300)
+
+    chunks = summarizer.chunk(tweets)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert [tweet['id'] for chunk in chunks for tweet in chunk] == [tweet['id'] for tweet in tweets]
+
+
+def test_new_and_evicted_tweets_only_change_edge_chunks():
+    summarizer = make_summarizer([], max_chunk_tweets=20)
+    tweets = synthetic_tweets(301)
+
+    before = summarizer.chunk(tweets[:300])
+    # One tweet evicted from the old end, one new tweet at the newest end
+    after = summarizer.chunk(tweets[1:301])
+    assert before[1:-1] == after[1:-1]
+
+
+def test_large_window_only_resummarizes_new_chunks():
+    calls = []
+    summarizer = make_summarizer(calls, max_chunk_tweets=20)
+    tweets = synthetic_tweets(301)
+
+    summarizer.summarize(tweets[:300])
+    first_run = len(calls)
+    calls.clear()
+    summarizer.summarize(tweets)
+    # The last chunk changed, plus the reduce
+    assert len(calls) == 2
+    assert first_run > 2
+
+
+def test_token_budget_applies_per_prompt_without_dropping_tweets():
+    calls = []
+    summarizer = make_summarizer(calls, token_budget=300)
+    tweets = synthetic_tweets(500)
+
+    summarizer.summarize(tweets)
+    chunk_prompts = [prompt for prompt in calls if prompt.startswith('CHUNK')]
+    assert sum(prompt.count('---') for prompt in chunk_prompts) + len(chunk_prompts) == 500
+    assert all(len(prompt) <= 300 * 4 + 500 for prompt in calls)
@@ -0,0 +1,83 @@
+import pytest
+
+import summary_cache
+from summary_cache import DiskBackend, MemoryBackend, SummaryCache, make_key
+
+TWEETS = [{'id': '2', 'text': 'second tweet'}, {'id': '1', 'text': 'first  tweet'}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(summary_cache.time, 'time', fake)
+    return fake
+
+
+@pytest.fixture(params=['memory', 'disk'])
+def make_backend(request, tmp_path):
+    def make(max_entries=256):
+        if request.param == 'memory':
+            return MemoryBackend(max_entries=max_entries)
+        return DiskBackend(str(tmp_path / 'summaries.db'), max_entries=max_entries)
+    return make
+
+
+def test_key_ignores_tweet_order_and_whitespace():
+    reordered = [{'id': '1', 'text': 'first tweet'}, {'id': '2', 'text': ' second tweet '}]
+    assert make_key(TWEETS, 'T {tweets}', 'model') == make_key(reordered, 'T {tweets}', 'model')
+
+
+def test_key_changes_with_template_model_and_text():
+    key = make_key(TWEETS, 'T {tweets}', 'model')
+    assert make_key(TWEETS, 'Other {tweets}', 'model') != key
+    assert make_key(TWEETS, 'T {tweets}', 'other-model') != key
+    assert make_key([dict(TWEETS[0], text='edited'), TWEETS[1]], 'T {tweets}', 'model') != key
+
+
+def test_entries_expire_after_ttl(clock, make_backend):
+    backend = make_backend()
+    backend.set('k', 'summary', ttl=60)
+
+    clock.now += 59
+    assert backend.get('k') == 'summary'
+    clock.now += 2
+    assert backend.get('k') is None
+
+
+def test_least_recently_used_entry_is_evicted(clock, make_backend):
+    backend = make_backend(max_entries=2)
+    backend.set('a', 'A')
+    clock.now += 1
+    backend.set('b', 'B')
+    clock.now += 1
+    # Reading 'a' makes 'b' the least recently used
+    assert backend.get('a') == 'A'
+    clock.now += 1
+    backend.set('c', 'C')
+
+    assert backend.get('b') is None
+    assert backend.get('a') == 'A'
+    assert backend.get('c') == 'C'
+
+
+def test_counters_track_hits_and_misses(make_backend):
+    cache = SummaryCache(make_backend(), ttl=60)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return 'summary'
+
+    assert cache.get_or_generate('k', generate) == 'summary'
+    assert cache.get_or_generate('k', generate) == 'summary'
+    assert cache.get('missing') is None
+    assert len(calls) == 1
+    assert cache.stats() == {'hits': 1, 'misses': 2}
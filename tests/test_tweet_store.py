@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from tweet_store import TweetStore, snowflake_for_time, TWITTER_EPOCH_MS, SNOWFLAKE_TIMESTAMP_SHIFT
+
+
+def tweet_at(when, sequence=0):
+    ms = int(when.timestamp() * 1000) - TWITTER_EPOCH_MS
+    return {'id': str((ms << SNOWFLAKE_TIMESTAMP_SHIFT) | sequence), 'text': f'tweet at {when.isoformat()}'}
+
+
+def test_snowflake_for_time_matches_a_known_tweet():
+    # 1917334675485249932 was posted on 2025-04-29 at 21:46:23 UTC
+    posted = datetime(2025, 4, 29, 21, 46, 23, tzinfo=timezone.utc)
+    assert snowflake_for_time(posted - timedelta(minutes=5)) < 1917334675485249932
+    assert snowflake_for_time(posted + timedelta(minutes=5)) > 1917334675485249932
+
+
+def test_merge_tracks_watermark_and_evicts_oldest(tmp_path):
+    store = TweetStore(str(tmp_path / 'tweets.db'), max_tweets=2)
+    store.merge('u', [{'id': '10', 'text': 'a'}, {'id': '20', 'text': 'b'}])
+    store.merge('u', [{'id': '30', 'text': 'c'}])
+
+    assert store.newest_id('u') == '30'
+    assert [tweet['id'] for tweet in store.get_window('u')] == ['30', '20']
+
+
+def test_get_window_since_leaves_out_older_tweets(tmp_path):
+    store = TweetStore(str(tmp_path / 'tweets.db'))
+    now = datetime.now(timezone.utc)
+    old, recent = tweet_at(now - timedelta(hours=20)), tweet_at(now - timedelta(hours=2))
+    store.merge('u', [old, recent])
+
+    assert [tweet['id'] for tweet in store.get_window('u', since=now - timedelta(hours=12))] == [recent['id']]
+    assert len(store.get_window('u')) == 2
+
+
+def test_discard_older_keeps_only_the_newer_run(tmp_path):
+    store = TweetStore(str(tmp_path / 'tweets.db'))
+    store.merge('u', [{'id': '10', 'text': 'a'}, {'id': '20', 'text': 'b'}])
+    store.merge('u', [{'id': '50', 'text': 'c'}, {'id': '60', 'text': 'd'}])
+    store.discard_older('u', '50')
+
+    assert [tweet['id'] for tweet in store.get_window('u')] == ['60', '50']
+    assert store.newest_id('u') == '60'
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+import requests
+
+import twitter_client
+from stub_twitter import start_stub_server
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    servers = []
+
+    def start(**kwargs):
+        server, base_url = start_stub_server(**kwargs)
+        servers.append(server)
+        monkeypatch.setattr(twitter_client, 'API_BASE', base_url)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_fetch_user_id(stub):
+    stub()
+    assert twitter_client.fetch_user_id(None) == '1'
+
+
+def test_iter_timeline_follows_pagination_up_to_max_tweets(stub, monkeypatch, fixture_tweets):
+    stub()
+    monkeypatch.setattr(twitter_client, 'MAX_PAGE_SIZE', 20)
+
+    tweets = list(twitter_client.iter_timeline('u-page', None, max_tweets=45))
+    assert [tweet['id'] for tweet in tweets] == [tweet['id'] for tweet in fixture_tweets[:45]]
+    assert twitter_client.timeline_calls_remaining('u-page') == 179
+
+
+def test_iter_timeline_stops_at_since_id(stub, fixture_tweets):
+    stub()
+    since_id = fixture_tweets[10]['id']
+
+    tweets = list(twitter_client.iter_timeline('u-since', None, max_tweets=50, since_id=since_id))
+    assert [tweet['id'] for tweet in tweets] == [tweet['id'] for tweet in fixture_tweets[:10]]
+
+
+def test_short_rate_limit_window_is_waited_out(stub):
+    stub(rate_limited=1, rate_limit_reset_in=1)
+
+    started = time.monotonic()
+    assert twitter_client.fetch_user_id(None) == '1'
+    assert time.monotonic() - started <= 2
+
+
+def test_long_rate_limit_window_raises_without_waiting(stub):
+    stub(rate_limited=1, rate_limit_reset_in=3600)
+
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        twitter_client.fetch_user_id(None)
+    assert error.value.response.status_code == 429
+    assert time.monotonic() - started < 1
@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import threading
+
+# Snowflake IDs hold milliseconds since Twitter's epoch in the bits above 22
+TWITTER_EPOCH_MS = 1288834974657
+SNOWFLAKE_TIMESTAMP_SHIFT = 22
+
+
+def snowflake_for_time(when):
+    """Smallest tweet ID that can have been created at or after the given aware datetime."""
+    return max(int(when.timestamp() * 1000) - TWITTER_EPOCH_MS, 0) << SNOWFLAKE_TIMESTAMP_SHIFT
+
+
+class TweetStore:
+    """Per-user window of recent tweets plus the newest_id watermark, backed by SQLite."""
+
+    def __init__(self, path, max_tweets=200):
+        self.path = path
+        self.max_tweets = max_tweets
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tweets (
+                user_id TEXT NOT NULL,
+                tweet_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (user_id, tweet_id)
+            );
+            CREATE TABLE IF NOT EXISTS watermarks (
+                user_id TEXT PRIMARY KEY,
+                newest_id TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def newest_id(self, user_id):
+        """Return the newest tweet ID seen for this user, or None on first visit."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_id FROM watermarks WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_window(self, user_id, since=None):
+        """Return the stored tweets for a user, newest first (same order as the timeline API).
+
+        With since (an aware datetime), tweets created before it are left out.
+        """
+        min_id = snowflake_for_time(since) if since is not None else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM tweets WHERE user_id = ? AND tweet_id >= ? ORDER BY tweet_id DESC LIMIT ?",
+                (user_id, min_id, self.max_tweets)
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def merge(self, user_id, tweets, newest_id=None, advance_watermark=True):
+        """Insert new tweets, advance the watermark and evict anything past max_tweets.
+
+        Pass advance_watermark=False for intermediate pages of a paginated sync, so
+        a failure part way through does not leave a gap behind the watermark.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tweets (user_id, tweet_id, payload) VALUES (?, ?, ?)",
+                [(user_id, int(tweet['id']), json.dumps(tweet)) for tweet in tweets]
+            )
+            if not advance_watermark:
+                newest_id = None
+            elif newest_id is None and tweets:
+                newest_id = max(tweets, key=lambda tweet: int(tweet['id']))['id']
+            if newest_id is not None:
+                # Only ever move the watermark forward
+                self._conn.execute(
+                    """INSERT INTO watermarks (user_id, newest_id) VALUES (?, ?)
+                       ON CONFLICT(user_id) DO UPDATE SET newest_id = excluded.newest_id
+                       WHERE CAST(excluded.newest_id AS INTEGER) > CAST(watermarks.newest_id AS INTEGER)""",
+                    (user_id, str(newest_id))
+                )
+            self._conn.execute(
+                """DELETE FROM tweets WHERE user_id = ? AND tweet_id NOT IN (
+                       SELECT tweet_id FROM tweets WHERE user_id = ? ORDER BY tweet_id DESC LIMIT ?
+                   )""",
+                (user_id, user_id, self.max_tweets)
+            )
+            self._conn.commit()
+
+    def discard_older(self, user_id, tweet_id):
+        """Drop stored tweets older than tweet_id, e.g. when a gap may separate them from newer ones."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM tweets WHERE user_id = ? AND tweet_id < ?", (user_id, int(tweet_id))
+            )
+            self._conn.commit()
+
+    def clear(self, user_id):
+        """Forget everything stored for a user."""
+        with self._lock:
+            self._conn.execute("DELETE FROM tweets WHERE user_id = ?", (user_id,))
+            self._conn.execute("DELETE FROM watermarks WHERE user_id = ?", (user_id,))
+            self._conn.commit()
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE = os.environ.get('TWITTER_API_BASE', 'https://api.twitter.com')
+REQUEST_TIMEOUT = float(os.environ.get('TWITTER_REQUEST_TIMEOUT', 10))
+# Longest we are willing to sleep on a 429 before giving up and surfacing the error
+MAX_RATE_LIMIT_WAIT = float(os.environ.get('TWITTER_MAX_RATE_LIMIT_WAIT', 5))
+# Only the fields the template renders
+TWEET_FIELDS = 'created_at,public_metrics'
+MAX_PAGE_SIZE = 100
+
+
+def make_session(pool_size=10, retries=3, backoff_factor=0.5):
+    """Build a keep-alive session that retries transient 5xx errors with backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    http = requests.Session()
+    http.mount('https://', adapter)
+    http.mount('http://', adapter)
+    return http
+
+
+# Shared by every request in this worker so connections (and TLS sessions) are reused
+http_session = make_session()
+
+
+def rate_limit_wait(response):
+    """Seconds until the rate-limit window in a 429 response resets, or None if unknown."""
+    reset = response.headers.get('x-rate-limit-reset')
+    if reset is None:
+        return None
+    return max(int(reset) - time.time(), 0)
+
+
+def get(path, auth, params=None):
+    """GET an API path through the pooled session, waiting out short rate-limit windows."""
+    url = f"{API_BASE}{path}"
+    response = http_session.get(url, auth=auth, params=params, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 429:
+        # Twitter reports the reset time in x-rate-limit-reset rather than Retry-After
+        wait = rate_limit_wait(response)
+        if wait is not None and wait <= MAX_RATE_LIMIT_WAIT:
+            time.sleep(wait)
+            response = http_session.get(url, auth=auth, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response
+
+
+def fetch_user_id(auth):
+    """Return the authenticated user's ID (v2 /users/me)."""
+    return get('/2/users/me', auth).json()['data']['id']
+
+
+# Last seen home-timeline rate-limit state per user: {user_id: (remaining, reset_epoch)}
+timeline_rate_limits = {}
+
+
+def fetch_timeline(user_id, auth, params=None):
+    """Return one page of the user's reverse-chronological home timeline as parsed JSON."""
+    response = get(f"/2/users/{user_id}/timelines/reverse_chronological", auth, params=params)
+    remaining = response.headers.get('x-rate-limit-remaining')
+    reset = response.headers.get('x-rate-limit-reset')
+    if remaining is not None and reset is not None:
+        timeline_rate_limits[user_id] = (int(remaining), int(reset))
+    return response.json()
+
+
+def timeline_calls_remaining(user_id):
+    """Home-timeline calls left in the user's current rate-limit window, or None if unknown."""
+    remaining, reset = timeline_rate_limits.get(user_id, (None, 0))
+    if remaining is None or reset <= time.time():
+        return None
+    return remaining
+
+
+_user_locks = {}
+_user_locks_lock = threading.Lock()
+
+
+def user_lock(user_id):
+    """Per-user lock so concurrent requests for one user never page the timeline in parallel."""
+    with _user_locks_lock:
+        return _user_locks.setdefault(user_id, threading.RLock())
+
+
+def iter_timeline(user_id, auth, max_tweets=50, since_id=None, start_time=None):
+    """Yield home timeline tweets newest first, following meta.next_token.
+
+    Stops after max_tweets, or when the API runs out of tweets newer than since_id /
+    start_time. The next page is fetched in the background while the caller
+    consumes the current one, and at most two pages are held in memory.
+    """
+    params = {'tweet.fields': TWEET_FIELDS}
+    if since_id:
+        params['since_id'] = since_id
+    if start_time:
+        params['start_time'] = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def fetch_page(remaining, next_token=None):
+        page_params = dict(params, max_results=max(min(remaining, MAX_PAGE_SIZE), 1))
+        if next_token:
+            page_params['pagination_token'] = next_token
+        return fetch_timeline(user_id, auth, params=page_params)
+
+    with user_lock(user_id):
+        prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix='timeline-prefetch')
+        try:
+            yielded = 0
+            future = prefetch.submit(fetch_page, max_tweets)
+            while future is not None:
+                page = future.result()
+                tweets = page.get('data', [])
+                next_token = page.get('meta', {}).get('next_token')
+                remaining = max_tweets - yielded - len(tweets)
+                future = prefetch.submit(fetch_page, remaining, next_token) if next_token and remaining > 0 else None
+                for tweet in tweets:
+                    yield tweet
+                    yielded += 1
+                    if yielded >= max_tweets:
+                        return
+        finally:
+            prefetch.shutdown(wait=False, cancel_futures=True)